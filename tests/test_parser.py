@@ -1,6 +1,9 @@
-from validator.parser import parse_file
+from validator import parser
+from validator.parser import collect_configs, parse_file
 from pathlib import Path
+import pytest
 import tempfile
+import time
 
 def test_parse_json():
     with tempfile.NamedTemporaryFile(mode='w+', suffix='.json', delete=False) as f:
@@ -10,3 +13,42 @@ def test_parse_json():
         assert result["foo"] == "bar"
 
 # Add more tests for HCL/YAML as needed
+
+def test_parse_yaml_by_suffix():
+    with tempfile.NamedTemporaryFile(mode='w+', suffix='.yaml', delete=False) as f:
+        f.write('foo: bar\n')
+        f.flush()
+        result = parse_file(Path(f.name))
+        assert result["foo"] == "bar"
+
+def test_parse_sniffs_unknown_suffix():
+    with tempfile.NamedTemporaryFile(mode='w+', suffix='.conf', delete=False) as f:
+        f.write('ui = true\n')
+        f.flush()
+        result = parse_file(Path(f.name))
+        assert result["ui"] is True
+
+def test_collect_configs_keeps_discovery_order(monkeypatch):
+    with tempfile.TemporaryDirectory() as d:
+        root = Path(d)
+        for i in range(6):
+            (root / f"cfg{i}.json").write_text(f'{{"n": {i}}}')
+        (root / "broken.json").write_text('{"n": ')
+        walked = [f for f in root.rglob('*') if f.suffix == '.json' and f.name != "broken.json"]
+
+        # Make earlier files finish last so completion order differs
+        real_parse = parser.parse_file
+        def slow_parse(path, suffix_hint=None):
+            if path.name != "broken.json":
+                time.sleep(0.01 * (6 - int(path.stem[3:])))
+            return real_parse(path, suffix_hint)
+        monkeypatch.setattr(parser, "parse_file", slow_parse)
+
+        result = collect_configs([d])
+        # Malformed files found by walking the directory are skipped
+        assert [p for p, _ in result] == walked
+        assert [doc["n"] for _, doc in result] == [int(p.stem[3:]) for p in walked]
+
+        # ...but a malformed file named explicitly raises
+        with pytest.raises(ValueError):
+            collect_configs([str(root / "broken.json")])
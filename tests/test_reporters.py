@@ -0,0 +1,55 @@
+import datetime
+import json
+import pytest
+from validator import reporters
+from validator.reporters import FileReport, print_report
+
+def _result(rule_id, passed, severity="critical"):
+    return {
+        "id": rule_id,
+        "title": None,
+        "severity": severity,
+        "passed": passed,
+        "observed": None,
+        "message": None,
+        "remediation": None,
+        "reference": None
+    }
+
+def _json_output(capsys, report):
+    print_report(report, "json")
+    out = capsys.readouterr().out
+    return out[out.index("\n") + 1:]
+
+def test_json_report_marks_truncated_entry(capsys):
+    report = [
+        FileReport("a.json", [_result("A", True)]),
+        FileReport("b.json", [_result("B", False)], truncated=True),
+    ]
+    data = json.loads(_json_output(capsys, report))
+    assert "truncated" not in data[0]
+    assert data[1]["truncated"] is True
+
+def test_console_report_says_evaluation_stopped(capsys):
+    report = [FileReport("b.json", [_result("B", False)], truncated=True)]
+    print_report(report, "console")
+    out = " ".join(capsys.readouterr().out.split())  # rich wraps long lines
+    assert "Stopped at first critical failure" in out
+    assert "remaining rules/files not evaluated" in out
+
+@pytest.mark.parametrize("dumps", ["default", "stdlib"])
+def test_json_report_matches_json_dumps(capsys, monkeypatch, dumps):
+    if dumps == "stdlib":
+        monkeypatch.setattr(reporters, "_dumps", reporters._stdlib_dumps)
+    first = _result("A", False)
+    first["message"] = "Hardcoded token \u2014 do not store tokens \U0001f511"
+    first["observed"] = [1, 2.5, None, {"nested": []}]
+    second = _result("B", False)
+    second["observed"] = [float("nan"), float("inf"), 1e16, 1e-07]
+    third = _result("C", False)
+    third["observed"] = datetime.date(2020, 1, 1)
+    report = [FileReport("a.json", [first]), FileReport("b.json", [second, third]), FileReport("c.json", [])]
+    entries = [{"file": e.file, "results": e.results} for e in report]
+    expected = json.dumps(entries, indent=2, default=str) + "\n"
+    assert _json_output(capsys, report) == expected
+    assert _json_output(capsys, []) == "[]\n"
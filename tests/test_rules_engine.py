@@ -1,5 +1,9 @@
+import datetime
 import pytest
-from validator.rules_engine import evaluate_rule
+from validator.rules_engine import (
+    FailLevelReached, compile_rules, document_key, evaluate_rule, load_rules,
+    run_rules_for_file,
+)
 
 def test_equals_operator():
     rule = {
@@ -21,3 +25,105 @@ def test_absent_operator():
     doc = {"foo": {"bar": 42}}
     result = evaluate_rule(rule, doc)
     assert result["passed"]
+
+def test_load_rules_reloads_changed_file(tmp_path):
+    rules_file = tmp_path / "rules.yaml"
+    rules_file.write_text("rules:\n  - id: A\n")
+    assert [r["id"] for r in load_rules(str(rules_file))] == ["A"]
+    assert [r["id"] for r in load_rules(str(rules_file))] == ["A"]
+    rules_file.write_text("rules:\n  - id: A\n  - id: B\n")
+    assert [r["id"] for r in load_rules(str(rules_file))] == ["A", "B"]
+
+def test_load_rules_returns_independent_rules(tmp_path):
+    rules_file = tmp_path / "rules.yaml"
+    rules_file.write_text("rules:\n  - id: A\n    severity: info\n")
+    first = compile_rules(load_rules(str(rules_file)))
+    first[0]["severity"] = "critical"
+    again = load_rules(str(rules_file))
+    assert again[0] == {"id": "A", "severity": "info"}
+
+def test_regex_operator_with_compiled_rules():
+    rules = compile_rules([{
+        "id": "TEST-003",
+        "jmespath": "listener[*].secret",
+        "operator": "regex",
+        "expected": "password:[^\\s]+"
+    }])
+    assert "_expr" in rules[0] and "_re" in rules[0]
+    assert not evaluate_rule(rules[0], {"listener": [{"secret": "password:hunter2"}]})["passed"]
+    assert evaluate_rule(rules[0], {"listener": [{"secret": "nothing here"}]})["passed"]
+
+def test_run_rules_stops_at_fail_level():
+    rules = [
+        {"id": "W-1", "jmespath": "missing", "operator": "exists", "severity": "warning"},
+        {"id": "C-1", "jmespath": "missing", "operator": "exists", "severity": "critical"},
+        {"id": "C-2", "jmespath": "missing", "operator": "exists", "severity": "critical"},
+    ]
+    assert len(run_rules_for_file(rules, {})) == 3
+    with pytest.raises(FailLevelReached) as exc:
+        run_rules_for_file(rules, {}, fail_level="critical")
+    assert exc.value.result["id"] == "C-1"
+    assert [r["id"] for r in exc.value.results] == ["W-1", "C-1"]
+
+def test_numeric_operators_with_precompiled_threshold():
+    rule = {"id": "TEST-004", "jmespath": "limit", "operator": "gt", "expected": "10"}
+    compile_rules([rule])
+    assert rule["_expected"] == 10.0
+    assert evaluate_rule(rule, {"limit": "11"})["passed"]
+    assert not evaluate_rule(rule, {"limit": 9})["passed"]
+    assert not evaluate_rule(rule, {"limit": "n/a"})["passed"]
+
+def test_rules_sharing_a_head_match_jmespath():
+    rules = compile_rules([
+        {"id": "L-1", "jmespath": "listener[*].tcp.tls_disable", "operator": "equals", "expected": False},
+        {"id": "L-2", "jmespath": "listener[*].tcp.address", "operator": "exists"},
+        {"id": "S-1", "jmespath": "storage.type", "operator": "equals", "expected": "raft"},
+    ])
+    doc = {
+        "listener": [{"tcp": {"tls_disable": False, "address": "0.0.0.0:8200"}}, {"tcp": {}}],
+        "storage": {"type": "raft"},
+    }
+    results = run_rules_for_file(rules, doc)
+    assert [r["observed"] for r in results] == [[False], ["0.0.0.0:8200"], "raft"]
+    assert all(r["passed"] for r in results)
+
+def test_run_rules_reuses_results_for_identical_documents():
+    rules = [{"id": "E-1", "jmespath": "ui", "operator": "equals", "expected": False}]
+    cache = {}
+    first = run_rules_for_file(rules, {"ui": False, "log_level": "INFO"}, cache=cache)
+    again = run_rules_for_file(rules, {"log_level": "INFO", "ui": False}, cache=cache)
+    other = run_rules_for_file(rules, {"ui": True}, cache=cache)
+    assert again is first
+    assert other is not first and not other[0]["passed"]
+    assert len(cache) == 2
+
+def test_run_rules_does_not_share_results_across_types():
+    rules = [{"id": "D-1", "jmespath": "expiry", "operator": "equals", "expected": "2020-01-01"}]
+    cache = {}
+    as_date = run_rules_for_file(rules, {"expiry": datetime.date(2020, 1, 1)}, cache=cache)
+    as_str = run_rules_for_file(rules, {"expiry": "2020-01-01"}, cache=cache)
+    assert not as_date[0]["passed"]
+    assert as_str[0]["passed"]
+    assert document_key({1: "x"}) is None
+    assert document_key({"1": "x"}) is not None
+
+def test_unknown_severity_trips_fail_level():
+    rules = [{"id": "H-1", "jmespath": "missing", "operator": "exists", "severity": "HIGH"}]
+    with pytest.raises(FailLevelReached) as exc:
+        run_rules_for_file(rules, {}, fail_level="critical")
+    assert exc.value.result["id"] == "H-1"
+
+def test_numeric_threshold_on_projected_tls_version():
+    rule = {"id": "TEST-005", "jmespath": "listener[*].tcp.tls_min_version", "operator": "gt", "expected": "12"}
+    doc = {"listener": [{"tcp": {"tls_min_version": "13"}}]}
+    assert evaluate_rule(rule, doc)["passed"]
+    named = {"id": "TEST-006", "jmespath": "tls_min_version", "operator": "lt", "expected": "tls12"}
+    compile_rules([named])
+    assert named["_expected"] == "tls12"
+    assert evaluate_rule(named, {"tls_min_version": "tls10"})["passed"]
+
+def test_numeric_threshold_on_scalar_tls_version():
+    rule = {"id": "TEST-007", "jmespath": "tls_min_version", "operator": "gt", "expected": "12"}
+    assert not evaluate_rule(rule, {"tls_min_version": "1.2"})["passed"]
+    # Non-"tls" strings compare as plain strings, as before; they must not raise
+    assert evaluate_rule(rule, {"tls_min_version": "TLSv1_2"})["passed"] in (True, False)
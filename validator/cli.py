@@ -1,7 +1,7 @@
 import click
 from .parser import collect_configs
-from .rules_engine import load_rules, run_rules_for_file
-from .reporters import print_report
+from .rules_engine import FailLevelReached, load_rules, run_rules_for_file
+from .reporters import FileReport, print_report
 
 @click.command()
 @click.argument("paths", nargs=-1, required=True)
@@ -19,19 +19,18 @@ def main(paths, rules, output, fail_level):
     for r in rules:
         all_rules.extend(load_rules(r))
     report = []
-    for path, parsed in files:
-        results = run_rules_for_file(all_rules, parsed)
-        report.append({"file": str(path), "results": results})
+    results_cache = {}  # identical documents share results
+    try:
+        for path, parsed in files:
+            results = run_rules_for_file(all_rules, parsed, fail_level=fail_level, cache=results_cache)
+            report.append(FileReport(str(path), results))
+    except FailLevelReached as e:
+        # Fail level already tripped: report what was evaluated and stop
+        report.append(FileReport(str(path), e.results, truncated=True))
+        print_report(report, output)
+        raise SystemExit(2)
     print_report(report, output)
     print("[hcp-config-validator] Validation complete.")
-    # determine exit code
-
-    if fail_level:
-        order = {"info": 0, "warning": 1, "critical": 2}
-        for entry in report:
-            for r in entry["results"]:
-                if (not r["passed"]) and (order[r["severity"]] >= order[fail_level]):
-                    raise SystemExit(2)
 
 
 if __name__ == "__main__":
@@ -11,13 +11,13 @@ from pathlib import Path
 # Handle both standalone and module execution
 try:
     from .parser import collect_configs
-    from .rules_engine import load_rules, run_rules_for_file
-    from .reporters import print_report
+    from .rules_engine import FailLevelReached, load_rules, run_rules_for_file
+    from .reporters import FileReport, print_report
 except ImportError:
     # When running as a standalone binary
     from parser import collect_configs
-    from rules_engine import load_rules, run_rules_for_file
-    from reporters import print_report
+    from rules_engine import FailLevelReached, load_rules, run_rules_for_file
+    from reporters import FileReport, print_report
 
 
 def get_rules_path():
@@ -157,24 +157,22 @@ def create_product_command(product_name):
         
         print(f"[hcp-config-validator] Loaded {len(all_rules)} rules for {product_name} validation")
         
-        # Run validation
+        # Run validation, stopping at the first issue at or above fail level
         report = []
-        for path, parsed in files:
-            results = run_rules_for_file(all_rules, parsed)
-            report.append({"file": str(path), "results": results})
+        results_cache = {}  # identical documents share results
+        try:
+            for path, parsed in files:
+                results = run_rules_for_file(all_rules, parsed, fail_level=fail_level, cache=results_cache)
+                report.append(FileReport(str(path), results))
+        except FailLevelReached as e:
+            report.append(FileReport(str(path), e.results, truncated=True))
+            print_report(report, output)
+            click.echo(f"Validation failed: Found {e.result['severity']} level issue(s)")
+            raise SystemExit(2)
         
         # Print report
         print_report(report, output)
         print(f"[hcp-config-validator] {product_name.title()} validation complete.")
-        
-        # Determine exit code based on fail level
-        if fail_level:
-            severity_order = {"info": 0, "warning": 1, "critical": 2}
-            for entry in report:
-                for result in entry["results"]:
-                    if (not result["passed"]) and (severity_order[result["severity"]] >= severity_order[fail_level]):
-                        click.echo(f"Validation failed: Found {result['severity']} level issue(s)")
-                        raise SystemExit(2)
     
     return product_command
 
@@ -205,20 +203,19 @@ def validate(paths, rules, output, fail_level):
         all_rules.extend(load_rules(r))
     
     report = []
-    for path, parsed in files:
-        results = run_rules_for_file(all_rules, parsed)
-        report.append({"file": str(path), "results": results})
+    results_cache = {}  # identical documents share results
+    try:
+        for path, parsed in files:
+            results = run_rules_for_file(all_rules, parsed, fail_level=fail_level, cache=results_cache)
+            report.append(FileReport(str(path), results))
+    except FailLevelReached as e:
+        # Fail level already tripped: report what was evaluated and stop
+        report.append(FileReport(str(path), e.results, truncated=True))
+        print_report(report, output)
+        raise SystemExit(2)
     
     print_report(report, output)
     print("[hcp-config-validator] Validation complete.")
-    
-    # Determine exit code
-    if fail_level:
-        severity_order = {"info": 0, "warning": 1, "critical": 2}
-        for entry in report:
-            for r in entry["results"]:
-                if (not r["passed"]) and (severity_order[r["severity"]] >= severity_order[fail_level]):
-                    raise SystemExit(2)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,29 @@
 import json
-import yaml
-import hcl2
+import os
+import re
+from yaml import load as _yaml_load
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# libyaml's loader is much faster than the pure-Python one and releases the
+# GIL while scanning, so YAML parsing can overlap across the collect_configs
+# worker threads.
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# orjson (the optional "speedups" extra) parses JSON several times faster
+try:
+    from orjson import loads as _fast_json_loads
+except ImportError:
+    from json import loads as _fast_json_loads
+
+_MAX_WORKERS = (os.cpu_count() or 1) * 4
+
+# File suffixes picked up when walking a directory
+_SUPPORTED_SUFFIXES = frozenset({'.hcl', '.tf', '.json', '.yaml', '.yml', '.toml'})
+
 def normalize_vault_hcl(parsed):
     """
     Convert HCL list-of-dicts structure to a flat dict for Vault configs.
@@ -18,13 +39,13 @@ def normalize_vault_hcl(parsed):
         for k, v in block.items():
             if k == 'storage' and isinstance(v, list) and v:
                 # e.g. [{'file': {}}]
-                storage_type = list(v[0].keys())[0]
+                storage_type = next(iter(v[0]))
                 out['storage'] = {'type': storage_type}
                 out['storage'].update(v[0][storage_type])
             elif k == 'listener' and isinstance(v, list):
                 listeners = []
                 for l in v:
-                    proto = list(l.keys())[0]
+                    proto = next(iter(l))
                     listener_conf = l[proto]
                     # Flatten: move all keys from listener_conf to top-level dict, add 'type'
                     flat_listener = dict(listener_conf)
@@ -35,42 +56,55 @@ def normalize_vault_hcl(parsed):
                 out[k] = v
     return out
 
+# Documented product defaults, injected only for keys that are not present.
+# Do NOT add Vault's api_addr here; it must be user-supplied for validation.
+_VAULT_LISTENER_DEFAULTS = {
+    'tls_disable': False,
+    'tls_min_version': 'tls12',
+    'tls_require_and_verify_client_cert': False,
+    'address': '127.0.0.1:8200',
+    'http_idle_timeout': '5m',
+    'http_read_timeout': '5m',
+    'http_write_timeout': '5m',
+    'tcp_keepalive': '0s',
+}
+_VAULT_TOP_DEFAULTS = {
+    'disable_mlock': False,
+    'default_lease_ttl': '768h',
+    'max_lease_ttl': '768h',
+    'ui': False,
+}
+_CONSUL_TOP_DEFAULTS = {
+    'datacenter': 'dc1',
+    'data_dir': '/opt/consul',
+    'log_level': 'INFO',
+    'ui': False,
+}
+_CONSUL_ADDRESSES_DEFAULTS = {
+    'http': '127.0.0.1',
+}
+_NOMAD_TOP_DEFAULTS = {
+    'region': 'global',
+    'datacenter': 'dc1',
+    'data_dir': '/opt/nomad',
+    'log_level': 'INFO',
+    'enable_syslog': False,
+}
+
+def _set_defaults(target, defaults):
+    for k, v in defaults.items():
+        target.setdefault(k, v)
+
 def inject_vault_defaults(cfg):
     """
     Inject Vault's documented default values for missing keys.
     Only inject for keys that are not present.
     https://developer.hashicorp.com/vault/docs/configuration/reference
     """
-    # Listener defaults
     if 'listener' in cfg and isinstance(cfg['listener'], list):
         for listener in cfg['listener']:
-            if 'tls_disable' not in listener:
-                listener['tls_disable'] = False
-            if 'tls_min_version' not in listener:
-                listener['tls_min_version'] = 'tls12'
-            if 'tls_require_and_verify_client_cert' not in listener:
-                listener['tls_require_and_verify_client_cert'] = False
-            if 'address' not in listener:
-                listener['address'] = '127.0.0.1:8200'
-            if 'http_idle_timeout' not in listener:
-                listener['http_idle_timeout'] = '5m'
-            if 'http_read_timeout' not in listener:
-                listener['http_read_timeout'] = '5m'
-            if 'http_write_timeout' not in listener:
-                listener['http_write_timeout'] = '5m'
-            if 'tcp_keepalive' not in listener:
-                listener['tcp_keepalive'] = '0s'
-    # Top-level defaults
-    if 'disable_mlock' not in cfg:
-        cfg['disable_mlock'] = False
-    if 'default_lease_ttl' not in cfg:
-        cfg['default_lease_ttl'] = '768h'
-    if 'max_lease_ttl' not in cfg:
-        cfg['max_lease_ttl'] = '768h'
-    if 'ui' not in cfg:
-        cfg['ui'] = False
-    # Do NOT inject api_addr by default; must be user-supplied for validation
-    # Add more as needed from docs
+            _set_defaults(listener, _VAULT_LISTENER_DEFAULTS)
+    _set_defaults(cfg, _VAULT_TOP_DEFAULTS)
     return cfg
 
 def inject_consul_defaults(cfg):
@@ -78,19 +112,9 @@ def inject_consul_defaults(cfg):
     Inject Consul's documented default values for missing keys.
     https://developer.hashicorp.com/consul/docs/agent/config/configuration
     """
-    # Example defaults (expand as needed)
-    if 'datacenter' not in cfg:
-        cfg['datacenter'] = 'dc1'
-    if 'data_dir' not in cfg:
-        cfg['data_dir'] = '/opt/consul'
-    if 'log_level' not in cfg:
-        cfg['log_level'] = 'INFO'
-    if 'ui' not in cfg:
-        cfg['ui'] = False
+    _set_defaults(cfg, _CONSUL_TOP_DEFAULTS)
     if 'addresses' in cfg and isinstance(cfg['addresses'], dict):
-        if 'http' not in cfg['addresses']:
-            cfg['addresses']['http'] = '127.0.0.1'
-    # Add more as needed
+        _set_defaults(cfg['addresses'], _CONSUL_ADDRESSES_DEFAULTS)
     return cfg
 
 def inject_nomad_defaults(cfg):
@@ -98,72 +122,115 @@ def inject_nomad_defaults(cfg):
     Inject Nomad's documented default values for missing keys.
     https://developer.hashicorp.com/nomad/docs/configuration
     """
-    if 'region' not in cfg:
-        cfg['region'] = 'global'
-    if 'datacenter' not in cfg:
-        cfg['datacenter'] = 'dc1'
-    if 'data_dir' not in cfg:
-        cfg['data_dir'] = '/opt/nomad'
-    if 'log_level' not in cfg:
-        cfg['log_level'] = 'INFO'
-    if 'enable_syslog' not in cfg:
-        cfg['enable_syslog'] = False
-    # Add more as needed
+    _set_defaults(cfg, _NOMAD_TOP_DEFAULTS)
     return cfg
 
-def parse_file(path: Path):
-    text = path.read_text()
-    # Try JSON
-    try:
-        return json.loads(text)
-    except Exception:
-        pass
-    # Try HCL2
-    try:
-        result = hcl2.loads(text)
-        # Normalize for Vault HCL
-        norm = normalize_vault_hcl(result)
-        # Product detection: Vault, Consul, Nomad (simple heuristics)
-        # Vault: has 'storage' and 'listener', Consul: has 'datacenter', Nomad: has 'region' or 'datacenter' and 'data_dir'
-        if 'storage' in norm and 'listener' in norm:
-            norm = inject_vault_defaults(norm)
-        elif 'datacenter' in norm and 'data_dir' in norm and 'region' in norm:
-            norm = inject_nomad_defaults(norm)
-        elif 'datacenter' in norm and 'data_dir' in norm:
-            norm = inject_consul_defaults(norm)
-        return norm
-    except Exception:
-        pass
-    # Try YAML
+def _inject_product_defaults(doc):
+    """Detect the product from its top-level keys and inject its defaults."""
+    # Vault: has 'storage' and 'listener', Consul: has 'datacenter', Nomad: has 'region' or 'datacenter' and 'data_dir'
+    if 'storage' in doc and 'listener' in doc:
+        doc = inject_vault_defaults(doc)
+    elif 'datacenter' in doc and 'data_dir' in doc and 'region' in doc:
+        doc = inject_nomad_defaults(doc)
+    elif 'datacenter' in doc and 'data_dir' in doc:
+        doc = inject_consul_defaults(doc)
+    return doc
+
+# The loaders take the raw file bytes: json and libyaml decode them
+# themselves, so only HCL pays for a separate decode.
+def _load_json(data):
     try:
-        doc = yaml.safe_load(text)
-        # Product detection for YAML as well
-        if isinstance(doc, dict):
-            if 'storage' in doc and 'listener' in doc:
-                doc = inject_vault_defaults(doc)
-            elif 'datacenter' in doc and 'data_dir' in doc and 'region' in doc:
-                doc = inject_nomad_defaults(doc)
-            elif 'datacenter' in doc and 'data_dir' in doc:
-                doc = inject_consul_defaults(doc)
-        return doc
-    except Exception:
-        pass
+        return _fast_json_loads(data)
+    except ValueError:
+        # orjson is stricter than json (no BOM, NaN or Infinity); let the
+        # stdlib decide before calling the file malformed
+        return json.loads(data)
+
+def _load_hcl(data):
+    # hcl2 pulls in lark and takes tens of ms to import, so only load it
+    # once an HCL file is actually parsed
+    import hcl2
+    # Normalize for Vault HCL
+    return _inject_product_defaults(normalize_vault_hcl(hcl2.loads(data.decode('utf-8'))))
+
+def _load_yaml(data):
+    doc = _yaml_load(data, Loader=_YamlLoader)
+    if isinstance(doc, dict):
+        doc = _inject_product_defaults(doc)
+    return doc
+
+_LOADERS = {
+    '.json': _load_json,
+    '.hcl': _load_hcl,
+    '.tf': _load_hcl,
+    '.yaml': _load_yaml,
+    '.yml': _load_yaml,
+}
+
+# A top-level HCL line: `key = ...`, `block {` or `block "label" {`
+_HCL_LINE = re.compile(rb'^\s*[A-Za-z_][\w-]*\s*(=|\{|")', re.MULTILINE)
+
+def _sniff_loader(data):
+    """Guess the format of a file with an unknown suffix from its content."""
+    stripped = data.lstrip()
+    if stripped.startswith((b'{', b'[')):
+        return _load_json
+    if not stripped or _HCL_LINE.search(data):
+        return _load_hcl
+    return _load_yaml
+
+def parse_file(path: Path, suffix_hint=None):
+    """
+    Parse a JSON, HCL or YAML config file.
+    The format is picked from the file suffix (or `suffix_hint`) so each
+    file is parsed once; unknown suffixes fall back to sniffing the content.
+    """
+    data = path.read_bytes()
+    suffix = suffix_hint if suffix_hint is not None else path.suffix.lower()
+    loader = _LOADERS.get(suffix)
+    if loader is not None:
+        try:
+            return loader(data)
+        except Exception as e:
+            raise ValueError(f"Unsupported or malformed file: {path}") from e
+    # Unknown suffix: try the sniffed format first, then the others
+    first = _sniff_loader(data)
+    others = [l for l in (_load_json, _load_hcl, _load_yaml) if l is not first]
+    for loader in [first] + others:
+        try:
+            return loader(data)
+        except Exception:
+            pass
     raise ValueError(f"Unsupported or malformed file: {path}")
 
 def collect_configs(paths):
     """Given a path or list of paths, return list of (Path, parsed_dict)."""
-    result = []
+    # First pass: expand directories into candidate files. Files passed
+    # explicitly must parse; files found by walking a directory are skipped
+    # when they don't.
+    candidates = []
     for p in paths:
         path = Path(p)
         if path.is_dir():
             for f in path.rglob('*'):
-                if f.suffix.lower() in ('.hcl', '.tf', '.json', '.yaml', '.yml', '.toml'):
-                    try:
-                        parsed = parse_file(f)
-                        result.append((f, parsed))
-                    except Exception:
-                        continue
+                if f.suffix.lower() in _SUPPORTED_SUFFIXES:
+                    candidates.append((f, False))
         elif path.is_file():
-            parsed = parse_file(path)
-            result.append((path, parsed))
+            candidates.append((path, True))
+    if not candidates:
+        return []
+
+    # Second pass: parse concurrently, keeping results in discovery order
+    with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(candidates))) as pool:
+        futures = [pool.submit(parse_file, f, f.suffix.lower()) for f, _ in candidates]
+
+    result = []
+    for (f, required), future in zip(candidates, futures):
+        try:
+            parsed = future.result()
+        except Exception:
+            if required:
+                raise
+            continue
+        result.append((f, parsed))
     return result
@@ -1,39 +1,141 @@
 import json
-from rich.console import Console
-from rich.table import Table
+import math
+import re
+import sys
+from collections import namedtuple
 
-console = Console()
+# One entry of a validation report: the file path and its rule results.
+# `truncated` marks the entry where evaluation stopped because --fail-level
+# was reached; its last result is the failing rule, and any remaining rules
+# and files were not evaluated.
+FileReport = namedtuple("FileReport", ["file", "results", "truncated"], defaults=[False])
+
+_console = None
+
+def _get_console():
+    # rich is only imported once a console report is printed, which keeps
+    # --help, --version and JSON output from paying for it
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+def _stdlib_dumps(obj):
+    # default=str writes YAML dates and other non-JSON values as strings
+    # instead of failing halfway through the streamed report
+    return json.dumps(obj, indent=2, default=str).encode()
+
+def _orjson_safe(value):
+    # True if orjson writes the value exactly like _stdlib_dumps: no NaN or
+    # Infinity (orjson writes null), no exponent floats (1e16 vs 1e+16) and
+    # no dates or other non-JSON types
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and _orjson_safe(v) for k, v in value.items())
+    if isinstance(value, list):
+        return all(_orjson_safe(v) for v in value)
+    if isinstance(value, float):
+        return math.isfinite(value) and "e" not in repr(value)
+    return value is None or isinstance(value, (str, int, bool))
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+def _escape_non_ascii(match):
+    # Same \uXXXX escapes (and surrogate pairs) as json.dumps' ensure_ascii
+    code = ord(match.group())
+    if code < 0x10000:
+        return "\\u%04x" % code
+    code -= 0x10000
+    return "\\u%04x\\u%04x" % (0xd800 | (code >> 10), 0xdc00 | (code & 0x3ff))
+
+try:
+    import orjson
+
+    def _dumps(obj):
+        # Values orjson renders differently go through the stdlib, so the
+        # output doesn't depend on whether orjson is installed
+        if not _orjson_safe(obj):
+            return _stdlib_dumps(obj)
+        try:
+            out = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # orjson rejects some values stdlib json accepts (e.g. huge ints)
+            return _stdlib_dumps(obj)
+        # orjson writes raw UTF-8; escape it like json.dumps does
+        if not out.isascii():
+            out = _NON_ASCII.sub(_escape_non_ascii, out.decode()).encode()
+        return out
+except ImportError:
+    _dumps = _stdlib_dumps
+
+def _print_json_report(report):
+    """Write the report as a JSON array one file entry at a time."""
+    sys.stdout.flush()
+    out = getattr(sys.stdout, "buffer", None)
+    write = out.write if out is not None else (lambda b: sys.stdout.write(b.decode()))
+    if not report:
+        write(b"[]\n")
+        return
+    write(b"[\n")
+    for i, entry in enumerate(report):
+        if i:
+            write(b",\n")
+        # Indent the entry to the same layout as json.dumps(report, indent=2)
+        entry_dict = entry._asdict()
+        if not entry.truncated:
+            del entry_dict["truncated"]
+        write(b"  " + _dumps(entry_dict).replace(b"\n", b"\n  "))
+    write(b"\n]\n")
+    if out is not None:
+        out.flush()
 
 def print_report(report, format_="console"):
     print("[hcp-config-validator] Generating report...")
     if format_ == "json":
-        print(json.dumps(report, indent=2))
+        _print_json_report(report)
         return
-    if not report or all(all(r["passed"] for r in file_res["results"]) for file_res in report):
+    # Calculate summary statistics for every file in a single pass over its results
+    summaries = []
+    any_failed = False
+    for file_res in report:
+        passed_rules = critical_failed = warning_failed = info_failed = 0
+        for r in file_res.results:
+            if r["passed"]:
+                passed_rules += 1
+                continue
+            # Count by severity
+            severity = r["severity"]
+            if severity == "critical":
+                critical_failed += 1
+            elif severity == "warning":
+                warning_failed += 1
+            elif severity == "info":
+                info_failed += 1
+        if passed_rules != len(file_res.results):
+            any_failed = True
+        summaries.append((passed_rules, critical_failed, warning_failed, info_failed))
+
+    console = _get_console()
+    if not any_failed:
         console.print("[green]No issues found. All checks passed![/green]")
         return
+    from rich.table import Table
     
-    for file_res in report:
-        # Calculate summary statistics
-        results = file_res["results"]
+    for file_res, (passed_rules, critical_failed, warning_failed, info_failed) in zip(report, summaries):
+        results = file_res.results
         total_rules = len(results)
-        passed_rules = sum(1 for r in results if r["passed"])
         failed_rules = total_rules - passed_rules
         
-        # Count by severity
-        critical_failed = sum(1 for r in results if not r["passed"] and r["severity"] == "critical")
-        warning_failed = sum(1 for r in results if not r["passed"] and r["severity"] == "warning")
-        info_failed = sum(1 for r in results if not r["passed"] and r["severity"] == "info")
-        
         # Print summary
-        console.print(f"\n[bold]Summary for {file_res['file']}:[/bold]")
-        console.print(f"Total rules: {total_rules} | Passed: [green]{passed_rules}[/green] | Failed: [red]{failed_rules}[/red]")
+        console.print(f"\n[bold]Summary for {file_res.file}:[/bold]")
+        stopped = " [yellow](evaluation stopped early)[/yellow]" if file_res.truncated else ""
+        console.print(f"Total rules: {total_rules}{stopped} | Passed: [green]{passed_rules}[/green] | Failed: [red]{failed_rules}[/red]")
         if failed_rules > 0:
             console.print(f"Failed by severity: Critical: [red]{critical_failed}[/red] | Warning: [yellow]{warning_failed}[/yellow] | Info: [blue]{info_failed}[/blue]")
         console.print()
         
         table = Table(
-            title=f"Config checks: {file_res['file']}", 
+            title=f"Config checks: {file_res.file}", 
             show_header=True, 
             header_style="bold magenta",
             show_lines=True,
@@ -50,7 +152,7 @@ def print_report(report, format_="console"):
         table.add_column("Message", style="white", min_width=30, ratio=3)
         table.add_column("Remediation", style="bright_white", min_width=30, ratio=3)
         table.add_column("Reference", style="dim blue", min_width=25, ratio=2)
-        for r in file_res["results"]:
+        for r in results:
             # Color-code severity and pass/fail status
             severity_color = {
                 "critical": "[red]CRITICAL[/red]",
@@ -70,4 +172,11 @@ def print_report(report, format_="console"):
                 r.get("reference") or "-"
             )
         console.print(table)
+    if report and report[-1].truncated:
+        last = report[-1]
+        failed = last.results[-1]
+        console.print(
+            f"[yellow]Stopped at first {failed['severity']} failure ({failed['id']} in {last.file}); "
+            "remaining rules/files not evaluated.[/yellow]"
+        )
     print("[hcp-config-validator] Report generation complete.")
@@ -1,8 +1,48 @@
-import yaml
+import functools
+import hashlib
 import jmespath
+import json
+import os
 import re
+from itertools import chain
+from yaml import load as _yaml_load
+
+# Prefer the libyaml-backed loader; fall back to the pure-Python one when
+# PyYAML was built without libyaml.
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
 OPERATORS = {"exists", "equals", "in", "regex", "gt", "lt", "not_equals", "absent"}
+SEVERITY_ORDER = {"info": 0, "warning": 1, "critical": 2}
+
+def _severity_rank(severity):
+    # Unknown severities (e.g. "HIGH") rank as critical, so a failing rule
+    # with a severity the gate doesn't recognise still trips it
+    return SEVERITY_ORDER.get(severity, SEVERITY_ORDER["critical"])
+
+class FailLevelReached(Exception):
+    """
+    Raised by run_rules_for_file when a rule at or above the requested
+    fail level fails. `results` holds the results evaluated so far for the
+    file, ending with the failing one (`result`).
+    """
+    def __init__(self, result, results):
+        super().__init__(f"{result['severity']} rule {result['id']} failed")
+        self.result = result
+        self.results = results
+
+@functools.lru_cache(maxsize=64)
+def _load_rules_cached(path, mtime_ns, size):
+    # mtime/size are part of the cache key so an edited file is re-read
+    with open(path, 'r') as f:
+        data = _yaml_load(f, Loader=_YamlLoader)
+    if isinstance(data, list):
+        return tuple(data)
+    elif isinstance(data, dict) and "rules" in data:
+        return tuple(data["rules"])
+    return ()
 
 def load_rules(path_or_list):
     rules = []
@@ -10,109 +50,281 @@ def load_rules(path_or_list):
         for p in path_or_list:
             rules.extend(load_rules(p))
     else:
-        with open(path_or_list, 'r') as f:
-            data = yaml.safe_load(f)
-            if isinstance(data, list):
-                rules.extend(data)
-            elif isinstance(data, dict) and "rules" in data:
-                rules.extend(data["rules"])
+        path = os.path.abspath(path_or_list)
+        st = os.stat(path)
+        # Copy each rule so callers (and compile_rules) can change their
+        # rules without touching the cached ones
+        rules.extend(
+            dict(r) if isinstance(r, dict) else r
+            for r in _load_rules_cached(path, st.st_mtime_ns, st.st_size)
+        )
     return rules
 
-def evaluate_rule(rule, doc):
+# Plain field paths with at most one [*] projection, e.g. "storage.type" or
+# "listener[*].tcp.tls_disable". These are split into a head expression
+# shared by every rule with the same head, plus a tail of dict keys.
+_IDENT = r"[A-Za-z_][A-Za-z0-9_]*"
+_SIMPLE_PATH = re.compile(rf"^({_IDENT}(?:\.{_IDENT})*)(\[\*\])?((?:\.{_IDENT})*)$")
+
+@functools.lru_cache(maxsize=256)
+def _compile_head(head):
+    return jmespath.compile(head)
+
+def _split_path(expr):
+    """Return (head, tail keys, is_projection), or None for other expressions."""
+    m = _SIMPLE_PATH.match(expr or "")
+    if not m:
+        return None
+    path, star, tail = m.groups()
+    if star:
+        return path, tuple(tail.split(".")[1:]), True
+    head, *keys = path.split(".")
+    return head, tuple(keys), False
+
+def _compile_rule(rule):
     expr = rule.get("jmespath")
+    try:
+        rule["_expr"] = jmespath.compile(expr) if expr else None
+    except Exception:
+        # An invalid expression never matches, same as a failed search
+        rule["_expr"] = None
+    split = _split_path(expr) if rule["_expr"] is not None else None
+    if split:
+        rule["_head"], rule["_tail"], rule["_projection"] = split
+        rule["_head_expr"] = _compile_head(rule["_head"])
+    else:
+        rule["_head"] = None
+    # Vault/Consul TLS versions ("tls12") are compared numerically
+    rule["_is_tls_version"] = (expr or "").endswith("tls_min_version")
     operator = rule.get("operator", "exists")
     expected = rule.get("expected")
-    observed = None
-
-    if expr:
+    rule["_re"] = None
+    if operator == "regex":
         try:
-            observed = jmespath.search(expr, doc)
+            rule["_re"] = re.compile(expected)
+            expected = rule["_re"]
         except Exception:
-            observed = None
-
-    # If observed is a list (e.g., multiple listeners), check all
-    if isinstance(observed, list):
-        # For 'exists', pass if all exist; for others, fail if any fail
-        # Special case: flatten nested lists (e.g., JMESPath wildcards)
-        flat = []
-        for item in observed:
-            if isinstance(item, list):
-                flat.extend(item)
-            else:
-                flat.append(item)
-        observed = flat
-        if operator == "regex":
-            # Fail if any item matches regex
-            passed = not any(_eval_single(operator, item, expected) for item in observed)
-        elif operator == "exists":
-            passed = all(_eval_single(operator, item, expected) for item in observed)
-        elif operator == "absent":
-            passed = all(_eval_single(operator, item, expected) for item in observed)
-        else:
-            passed = all(_eval_single(operator, item, expected) for item in observed)
-    else:
-        passed = _eval_single(operator, observed, expected, rule=rule)
-
-    return {
+            pass  # leave it to re.search to report at evaluation time
+    elif operator in ("gt", "lt"):
+        # Convert the threshold once instead of on every comparison. A TLS
+        # version like "tls12" isn't numeric and stays a string.
+        try:
+            expected = float(expected)
+        except (TypeError, ValueError):
+            pass
+    # The value passed to the operator check in place of the raw "expected"
+    rule["_expected"] = expected
+    rule["_check"] = _CHECKS.get(operator, _check_unknown)
+    # Fixed part of every result for this rule; evaluate_rule fills in
+    # "passed" and "observed"
+    rule["_result"] = {
         "id": rule.get("id"),
         "title": rule.get("title"),
         "severity": rule.get("severity", "info"),
-        "passed": passed,
-        "observed": observed,
+        "passed": None,
+        "observed": None,
         "message": rule.get("message"),
         "remediation": rule.get("remediation"),
         "reference": rule.get("reference")
     }
 
-def _eval_single(operator, observed, expected, rule=None):
-    # Special case for Vault TLS version string comparison
-    def tls_version_to_num(v):
-        if v is None:
-            return 0  # Default to lowest version if None
-        if isinstance(v, str) and v.startswith("tls"):
-            return int(v.replace("tls", ""))
-        return v if v is not None else 0
-    if operator == "exists":
-        return observed is not None and observed != "" and not (isinstance(observed, str) and observed.strip() == "")
-    elif operator == "absent":
-        # Consider absent if None, empty string, or only whitespace
-        return observed is None or (isinstance(observed, str) and observed.strip() == "")
-    elif operator == "equals":
-        # For tls_min_version, compare as version
-        if rule and rule.get("jmespath", "").endswith("tls_min_version"):
-            return tls_version_to_num(observed) == tls_version_to_num(expected)
-        return observed == expected
-    elif operator == "not_equals":
-        if rule and rule.get("jmespath", "").endswith("tls_min_version"):
-            return tls_version_to_num(observed) != tls_version_to_num(expected)
-        return observed != expected
-    elif operator == "in":
-        return observed in expected if observed is not None else False
-    elif operator == "regex":
-        # Only fail if a real match is found
-        if observed is None:
-            return False
-        return bool(re.search(expected, str(observed)))
-    elif operator == "gt":
-        # For tls_min_version, compare as version
-        if rule and rule.get("jmespath", "").endswith("tls_min_version"):
-            return tls_version_to_num(observed) > tls_version_to_num(expected)
-        try:
-            return float(observed) > float(expected)
-        except Exception:
-            return False
-    elif operator == "lt":
-        if rule and rule.get("jmespath", "").endswith("tls_min_version"):
-            return tls_version_to_num(observed) < tls_version_to_num(expected)
+def compile_rules(rules):
+    """
+    Pre-compile each rule's JMESPath expression, regex pattern, numeric
+    threshold, operator check and result fields in place, so evaluating a
+    rule set against many documents does that work only once. Plain field
+    paths are grouped by their head so run_rules_for_file evaluates each
+    head once per document.
+    """
+    for rule in rules:
+        if "_expr" not in rule:
+            _compile_rule(rule)
+    return rules
+
+def _lookup(value, keys):
+    # Same result as a JMESPath sub-expression of plain field names
+    for k in keys:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(k)
+    return value
+
+def _search(rule, doc, subtrees):
+    head = rule["_head"]
+    if head is None:
+        compiled = rule["_expr"]
+        if compiled is None:
+            return None
         try:
-            return float(observed) < float(expected)
+            return compiled.search(doc)
         except Exception:
-            return False
+            return None
+    # Rules sharing a head walk the document down to it only once
+    try:
+        subtree = subtrees[head]
+    except KeyError:
+        subtree = subtrees[head] = rule["_head_expr"].search(doc)
+    if not rule["_projection"]:
+        return _lookup(subtree, rule["_tail"])
+    if not isinstance(subtree, list):
+        return None
+    # A projection drops null results, like JMESPath's [*]
+    tail = rule["_tail"]
+    out = []
+    for item in subtree:
+        value = _lookup(item, tail)
+        if value is not None:
+            out.append(value)
+    return out
+
+def evaluate_rule(rule, doc, subtrees=None):
+    """
+    Evaluate one rule against a parsed document.
+    `subtrees` caches head-expression results across rules evaluated
+    against the same document (see run_rules_for_file).
+    """
+    if "_expr" not in rule:
+        _compile_rule(rule)
+    check = rule["_check"]
+    expected = rule["_expected"]
+    observed = _search(rule, doc, {} if subtrees is None else subtrees)
+
+    # If observed is a list (e.g., multiple listeners), check all
+    if isinstance(observed, list):
+        # For 'exists', pass if all exist; for others, fail if any fail
+        # Special case: flatten nested lists (e.g., JMESPath wildcards).
+        # Lists of scalars (the common case) are used as they are.
+        if any(isinstance(item, list) for item in observed):
+            observed = list(chain.from_iterable(
+                item if isinstance(item, list) else (item,) for item in observed
+            ))
+        if check is _check_regex:
+            # Fail if any item matches regex
+            passed = not any(check(item, expected, False) for item in observed)
+        else:
+            passed = all(check(item, expected, False) for item in observed)
+    elif rule["_is_tls_version"]:
+        # Scalar TLS versions compare as versions against the raw threshold;
+        # the float form is only for the numeric comparisons above
+        passed = check(observed, rule.get("expected"), True)
     else:
+        passed = check(observed, expected, False)
+
+    result = dict(rule["_result"])
+    result["passed"] = passed
+    result["observed"] = observed
+    return result
+
+def _tls_version_to_num(v):
+    # Special case for Vault TLS version string comparison
+    if v is None:
+        return 0  # Default to lowest version if None
+    if isinstance(v, str) and v.startswith("tls"):
+        return int(v.replace("tls", ""))
+    return v if v is not None else 0
+
+# One check per operator, picked once per rule by _compile_rule.
+# `tls` is set for scalar tls_min_version values, which compare as versions.
+def _check_exists(observed, expected, tls):
+    return observed is not None and observed != "" and not (isinstance(observed, str) and observed.strip() == "")
+
+def _check_absent(observed, expected, tls):
+    # Consider absent if None, empty string, or only whitespace
+    return observed is None or (isinstance(observed, str) and observed.strip() == "")
+
+def _check_equals(observed, expected, tls):
+    if tls:
+        return _tls_version_to_num(observed) == _tls_version_to_num(expected)
+    return observed == expected
+
+def _check_not_equals(observed, expected, tls):
+    if tls:
+        return _tls_version_to_num(observed) != _tls_version_to_num(expected)
+    return observed != expected
+
+def _check_in(observed, expected, tls):
+    return observed in expected if observed is not None else False
+
+def _check_regex(observed, expected, tls):
+    # Only fail if a real match is found
+    if observed is None:
+        return False
+    if isinstance(expected, re.Pattern):
+        return bool(expected.search(str(observed)))
+    return bool(re.search(expected, str(observed)))
+
+def _check_gt(observed, expected, tls):
+    if tls:
+        return _tls_version_to_num(observed) > _tls_version_to_num(expected)
+    try:
+        return float(observed) > expected
+    except Exception:
         return False
 
-def run_rules_for_file(rules, parsed_doc):
+def _check_lt(observed, expected, tls):
+    if tls:
+        return _tls_version_to_num(observed) < _tls_version_to_num(expected)
+    try:
+        return float(observed) < expected
+    except Exception:
+        return False
+
+def _check_unknown(observed, expected, tls):
+    return False
+
+_CHECKS = {
+    "exists": _check_exists,
+    "absent": _check_absent,
+    "equals": _check_equals,
+    "not_equals": _check_not_equals,
+    "in": _check_in,
+    "regex": _check_regex,
+    "gt": _check_gt,
+    "lt": _check_lt,
+}
+
+def _is_plain_json(value):
+    # True if json.dumps round-trips the value without losing its type:
+    # str keys only, and no tuples, dates or other non-JSON values
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and _is_plain_json(v) for k, v in value.items())
+    if isinstance(value, list):
+        return all(_is_plain_json(v) for v in value)
+    return value is None or isinstance(value, (str, int, float, bool))
+
+def document_key(parsed_doc):
+    """
+    Stable digest of a parsed document, used to recognise identical configs
+    (e.g. a fleet of templated servers). Returns None for documents that
+    JSON can't represent exactly (dates, non-str keys, ...), which are
+    never shared.
+    """
+    if not _is_plain_json(parsed_doc):
+        return None
+    dumped = json.dumps(parsed_doc, sort_keys=True)
+    return hashlib.blake2b(dumped.encode(), digest_size=16).digest()
+
+def run_rules_for_file(rules, parsed_doc, fail_level=None, cache=None):
+    """
+    Evaluate every rule against one parsed document.
+    With `fail_level` set, stop at the first failing rule of that severity
+    or higher and raise FailLevelReached.
+    `cache` is an optional dict reused across the files of one run (same
+    rules and fail_level): documents identical to one already evaluated
+    get its results back without re-running the rules.
+    """
+    key = document_key(parsed_doc) if cache is not None else None
+    if key is not None and key in cache:
+        return cache[key]
+    compile_rules(rules)
+    threshold = SEVERITY_ORDER[fail_level] if fail_level else None
     results = []
+    subtrees = {}
     for r in rules:
-        results.append(evaluate_rule(r, parsed_doc))
+        result = evaluate_rule(r, parsed_doc, subtrees)
+        results.append(result)
+        if threshold is not None and not result["passed"] and _severity_rank(result["severity"]) >= threshold:
+            raise FailLevelReached(result, results)
+    if key is not None:
+        cache[key] = results
     return results